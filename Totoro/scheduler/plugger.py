@@ -22,7 +22,9 @@ from Totoro.scheduler.timeline import Timeline
 from Totoro.scheduler import observingPlan
 from Totoro.exceptions import TotoroPluggerWarning, TotoroPluggerError
 from Totoro.utils import intervals
-from collections import OrderedDict
+from collections import OrderedDict, deque, namedtuple
+from operator import itemgetter
+from sqlalchemy.orm import joinedload
 import warnings
 import numpy as np
 
@@ -32,6 +34,15 @@ __all__ = ['Plugger']
 cartStatusCodes = {0: 'empty', 1: 'noMaNGAplate', 2: 'MaNGA_complete',
                    3: 'MaNGA_noStarted', 4: 'MaNGA_started', 10: 'unknown'}
 
+# Status of a cart, as returned by getCartStatus.
+CartStatus = namedtuple('CartStatus',
+                        ['cartNumber', 'plate', 'statusCode', 'completion'])
+
+# Order in which carts are allocated, depending on the status of the plate
+# plugged in the cart.
+cartPriority = ('MaNGA_complete', 'empty', 'unknown', 'noMaNGAplate',
+                'MaNGA_noStarted', 'MaNGA_started')
+
 replaceMsgs = {0: 'empty cart', 1: 'replacing non-MaNGA plate',
                2: 'replacing complete MaNGA plate',
                3: 'replacing non-started MaNGA plate',
@@ -64,39 +75,72 @@ def getForcePlugPlates():
 
 
 def getActivePluggings():
-    """Returns a list with the active pluggings."""
+    """Returns a list with the active pluggings.
+
+    The plugging, cartridge and plate of each active plugging are eagerly
+    loaded in the same query.
+
+    """
 
     db = getConnection()
     session = db.Session()
+    plateDB = db.plateDB
 
     # Gets active pluggings
     with session.begin():
-        activePluggings = session.query(
-            db.plateDB.ActivePlugging).order_by(
-                db.plateDB.ActivePlugging.pk).all()
+        activePluggings = session.query(plateDB.ActivePlugging).options(
+            joinedload(plateDB.ActivePlugging.plugging).joinedload(
+                plateDB.Plugging.cartridge),
+            joinedload(plateDB.ActivePlugging.plugging).joinedload(
+                plateDB.Plugging.plate).joinedload(
+                    plateDB.Plate.currentSurveyMode)).order_by(
+                        plateDB.ActivePlugging.pk).all()
 
     return activePluggings
 
 
-def getCartStatus(activePluggings, cartNumber):
+def getActivePluggingsByCart(activePluggings, carts):
+    """Returns a dictionary of active pluggings keyed by cart number.
+
+    Only the active pluggings in `carts` are included. Raises an error if more
+    than one active plugging is found for any of those carts. Other carts
+    (e.g., APOGEE carts) are not checked.
+
+    """
+
+    carts = set(carts)
+    activePluggingsByCart = {}
+
+    for aP in activePluggings:
+        cartNumber = aP.plugging.cartridge.number
+        if cartNumber not in carts:
+            continue
+        if cartNumber in activePluggingsByCart:
+            raise TotoroPluggerError(
+                'PLUGGER: something went wrong. Cart #{0} has more than one '
+                'active plugging'.format(cartNumber))
+        activePluggingsByCart[cartNumber] = aP
+
+    return activePluggingsByCart
+
+
+def getCartStatus(activePluggingsByCart, cartNumber):
     """Returns the status of the plate in a cart.
 
-    The returned tuple is (cart_number, plate, status_code, completion)
+    `activePluggingsByCart` is a dictionary of active pluggings keyed by cart
+    number, as returned by `getActivePluggingsByCart`.
+
+    Returns a `CartStatus` named tuple with fields
+    `(cartNumber, plate, statusCode, completion)`.
+
     """
 
     from Totoro.dbclasses.plate import Plate
 
-    cartActivePluggings = [aP for aP in activePluggings
-                           if aP.plugging.cartridge.number == cartNumber]
+    cartActivePlugging = activePluggingsByCart.get(cartNumber)
 
-    if len(cartActivePluggings) == 0:
-        return (cartNumber, None, 0, 0)  # Empty cart
-    elif len(cartActivePluggings) > 1:
-        raise TotoroPluggerError(
-            'PLUGGER: something went wrong. Cart #{0} has more than one '
-            'active plugging'.format(cartNumber))
-    else:
-        cartActivePlugging = cartActivePluggings[0]
+    if cartActivePlugging is None:
+        return CartStatus(cartNumber, None, 0, 0)  # Empty cart
 
     plate = cartActivePlugging.plugging.plate
 
@@ -104,41 +148,102 @@ def getCartStatus(activePluggings, cartNumber):
                     'MaNGA' in plate.currentSurveyMode.label)
 
     if not isMaNGAPlate:
-        return (cartNumber, plate, 1, 0)  # No MaNGA plate
+        return CartStatus(cartNumber, plate, 1, 0)  # No MaNGA plate
 
     totoroPlate = Plate(plate)
 
     if totoroPlate.isComplete:
-        return (cartNumber, totoroPlate, 2, 1.)  # Complete MaNGA plate
+        return CartStatus(cartNumber, totoroPlate, 2, 1.)  # Complete plate
 
     plateCompletion = totoroPlate.getPlateCompletion()
     if plateCompletion == 0:
         # Non-stated MaNGA plate
-        return (cartNumber, totoroPlate, 3, plateCompletion)
+        return CartStatus(cartNumber, totoroPlate, 3, plateCompletion)
     else:
         # Started MaNGA plate
-        return (cartNumber, totoroPlate, 4, plateCompletion)
-
-    return (cartNumber, None, 10, 0)  # Unknown
+        return CartStatus(cartNumber, totoroPlate, 4, plateCompletion)
 
 
-def getCartPlate(activePluggings, cartNumber):
+def getCartPlate(activePluggingsByCart, cartNumber):
     """Returns the plate plugged in a cart or None."""
 
-    for aP in activePluggings:
-        if aP.plugging.cartridge.number == cartNumber:
-            return aP.plugging.plate
-    return None
+    cartActivePlugging = activePluggingsByCart.get(cartNumber)
+    if cartActivePlugging is None:
+        return None
 
+    return cartActivePlugging.plugging.plate
 
-def getCartLastPlugging(plate):
-    """Returns the cart number of the last plugging."""
 
-    if len(plate.pluggings) == 0:
-        return None
+def getCartsLastPlugging(plates):
+    """Returns the cart number of the last plugging for a list of plates.
+
+    Retrieves the pluggings of all the plates in a single query. Returns a
+    dictionary keyed by plate_id. Plates that have never been plugged are not
+    included.
+
+    """
+
+    plateIDs = [plate.plate_id for plate in plates]
+
+    if len(plateIDs) == 0:
+        return {}
+
+    db = getConnection()
+    session = db.Session()
+    plateDB = db.plateDB
+
+    with session.begin():
+        pluggings = session.query(
+            plateDB.Plate.plate_id, plateDB.Cartridge.number).join(
+                plateDB.Plugging, plateDB.Cartridge).filter(
+                    plateDB.Plate.plate_id.in_(plateIDs)).order_by(
+                        plateDB.Plugging.fscan_mjd.desc().nullslast(),
+                        plateDB.Plugging.pk.desc()).all()
+
+    # Pluggings are sorted from newest to oldest, so we keep the first cart
+    # found for each plate. Pluggings with the same fscan_mjd are sorted by pk
+    # so that the result is deterministic.
+    lastCarts = {}
+    for plateID, cartNumber in pluggings:
+        if plateID not in lastCarts:
+            lastCarts[plateID] = cartNumber
+
+    return lastCarts
+
+
+def getPlatesStatusAndLocation(plates):
+    """Returns the status and location labels for a list of plates.
 
-    scanMJDs = [plugging.fscan_mjd for plugging in plate.pluggings]
-    return plate.pluggings[np.argmax(scanMJDs)].cartridge.number
+    The statuses and locations of all the plates are eager-loaded in a single
+    query. Returns a dictionary keyed by plate_id with a tuple
+    `(statusLabel, locationLabel)` for each plate.
+
+    """
+
+    plateIDs = [plate.plate_id for plate in plates]
+
+    if len(plateIDs) == 0:
+        return {}
+
+    db = getConnection()
+    session = db.Session()
+    plateDB = db.plateDB
+
+    with session.begin():
+        dbPlates = session.query(plateDB.Plate).options(
+            joinedload(plateDB.Plate.statuses),
+            joinedload(plateDB.Plate.location)).filter(
+                plateDB.Plate.plate_id.in_(plateIDs)).all()
+
+        labels = {}
+        for dbPlate in dbPlates:
+            statusLabel = (dbPlate.statuses[0].label
+                           if len(dbPlate.statuses) > 0 else None)
+            locationLabel = (dbPlate.location.label
+                             if dbPlate.location is not None else None)
+            labels[dbPlate.plate_id] = (statusLabel, locationLabel)
+
+    return labels
 
 
 def prioritiseCarts(carts):
@@ -148,8 +253,8 @@ def prioritiseCarts(carts):
     ----------
     carts : list
         A list with all or a subset of the MaNGA carts. Each element in the
-        list is a tuple of the form
-        `(cart_number, plate, status_code, completion)`
+        list is a `CartStatus` named tuple of the form
+        `(cartNumber, plate, statusCode, completion)`
 
     Returns
     -------
@@ -164,35 +269,17 @@ def prioritiseCarts(carts):
 
     """
 
-    # Creates some intermediate lists
-    empty = []
-    noMaNGA = []
-    complete = []
-    noStarted = []
-    unknown = []
-    started = []
-
-    # Assigns carts to the appropriate list.
+    # Assigns carts to a list for each status, in priority order.
+    buckets = {statusLabel: [] for statusLabel in cartPriority}
     for cart in carts:
-        statusLabel = cartStatusCodes[cart[2]]
-        if statusLabel == 'empty':
-            empty.append(cart)
-        elif statusLabel == 'noMaNGAplate':
-            noMaNGA.append(cart)
-        elif statusLabel == 'MaNGA_complete':
-            complete.append(cart)
-        elif statusLabel == 'MaNGA_noStarted':
-            noStarted.append(cart)
-        elif statusLabel == 'unknown':
-            unknown.append(cart)
-        elif statusLabel == 'MaNGA_started':
-            started.append(cart)
-
-    # Sorts started carts using the completion (fourth element of the tuple).
-    started = sorted(started, key=lambda xx: xx[3])
+        buckets[cartStatusCodes[cart.statusCode]].append(cart)
+
+    # Sorts started carts using the completion.
+    buckets['MaNGA_started'].sort(key=lambda xx: xx.completion)
 
     # Returns carts in the desired order.
-    return complete + empty + unknown + noMaNGA + noStarted + started
+    return [cart for statusLabel in cartPriority
+            for cart in buckets[statusLabel]]
 
 
 class Plugger(object):
@@ -308,7 +395,7 @@ class Plugger(object):
                  .format(len(self._platesToSchedule)))
 
         # Initialises a dictionary with the MaNGA carts.
-        self.carts = OrderedDict([(key, None) for key in config['mangaCarts']])
+        self.carts = OrderedDict.fromkeys(config['mangaCarts'])
 
     def getPlatesToSchedule(
             self, onlyMarked=False,
@@ -356,8 +443,10 @@ class Plugger(object):
                                          raRange=raRange)
         plugged = dbclasses.getPlugged()
 
+        platesAtAPOIDs = set([plate.plate_id for plate in platesAtAPO])
         platesToSchedule = platesAtAPO + [plate for plate in plugged
-                                          if plate not in platesAtAPO]
+                                          if plate.plate_id not in
+                                          platesAtAPOIDs]
 
         log.info('PLUGGER: plates found: {0}'.format(len(platesToSchedule)))
 
@@ -392,11 +481,12 @@ class Plugger(object):
         scheduledPlates = self.timeline.scheduled + forcePlugPlates
 
         # We log the number of new exposures for the plates in the timeline.
-        # We'll use this later when we prioritise carts.
-        self._nNewExposures = {}
-        for plate in scheduledPlates:
-            nNewExposuresPlate = len(plate.getMockExposures())
-            self._nNewExposures[plate.plate_id] = nNewExposuresPlate
+        # We'll use this later when we prioritise carts. The timeline keeps
+        # count of them so we don't need to go through the mock exposures of
+        # each plate.
+        self._nNewExposures = {
+            plate.plate_id: self.timeline.nNewExposures.get(plate, 0)
+            for plate in scheduledPlates}
 
         # Allocates carts
         self.allocateCarts(scheduledPlates)
@@ -408,25 +498,37 @@ class Plugger(object):
         else:
             log.debug('PLUGGER: all the time has been allocated.')
 
-    def logCartAllocation(self, activePluggings):
-        """Logs the cart allocation."""
+    def logCartAllocation(self, cartStatus, lastCarts):
+        """Logs the cart allocation.
+
+        `cartStatus` is a dictionary with the output of `getCartStatus` for
+        each cart, as calculated during the cart allocation. `lastCarts` is
+        the output of `getCartsLastPlugging` for the allocated plates.
+
+        """
+
+        offlineCarts = set(config['offlineCarts'])
+
+        # Loads the status and location of all the allocated plates at once,
+        # instead of one query per plate.
+        plateLabels = getPlatesStatusAndLocation(
+            [plate for plate in self.carts.values() if plate is not None])
 
         mjd = int(self.timeline.endDate - 2400000.5)
         log.important('Plugging allocation for MJD={0:d} follows:'
                       .format(mjd))
 
-        for cartNo, plate in self.carts.iteritems():
+        for cartNo, plate in self.carts.items():
 
-            cartStatus = getCartStatus(activePluggings, cartNo)
-            pluggedPlate = cartStatus[1]
-            status = cartStatusCodes[cartStatus[2]]
+            pluggedPlate = cartStatus[cartNo].plate
+            status = cartStatusCodes[cartStatus[cartNo].statusCode]
 
             if plate is None:
 
                 if status == 'noMaNGAplate':
                     message = ('plate_id={0} (APOGEE-2 plate, not doing '
                                'anything)'.format(pluggedPlate.plate_id))
-                elif cartNo in config['offlineCarts']:
+                elif cartNo in offlineCarts:
                     message = 'offline'
                 elif pluggedPlate is not None:
                     message = ('plate_id={0} (unplug)'
@@ -443,31 +545,38 @@ class Plugger(object):
                         pluggedPlate.plate_id == plate.plate_id):
                     message = 'already plugged'
                 else:
-                    message = replaceMsgs[cartStatus[2]]
+                    message = replaceMsgs[cartStatus[cartNo].statusCode]
 
-                    if getCartLastPlugging(plate) is not None:
+                    if lastCarts.get(plate.plate_id) is not None:
                         message += ', replug'
 
-                    plateStatus = plate.statuses[0].label
+                    plateStatus, plateLocation = plateLabels.get(
+                        plate.plate_id, (None, None))
 
-                    if (plateStatus == 'Shipped' and
-                            plate.location.label == 'APO'):
+                    if plateStatus == 'Shipped' and plateLocation == 'APO':
                         message += ', plate has not been marked'
 
                 log.important('Cart #{0} -> plate_id={1} ({2})'
                               .format(cartNo, plate.plate_id, message))
 
     def _getCart(self, sortedCarts):
-        """Given a list of sorted carts returns the first not allocated."""
+        """Given a deque of sorted carts returns the first not allocated.
 
-        for cart in sortedCarts:
-            if self.carts[cart[0]] is None:
+        Carts are popped from the left of `sortedCarts` until one that has not
+        been allocated is found. Allocated carts cannot become free again, so
+        they do not need to be checked in subsequent calls.
+
+        """
+
+        while len(sortedCarts) > 0:
+            cart = sortedCarts.popleft()
+            if self.carts[cart.cartNumber] is None:
                 return cart
 
     def allocateCarts(self, plates):
         """Allocates plates into carts in the most efficient way."""
 
-        offlineCarts = config['offlineCarts']
+        offlineCarts = set(config['offlineCarts'])
         forcePlugPriority = int(config['plugger']['forcePlugPriority'])
 
         if len(plates) > len(self.carts):
@@ -479,61 +588,77 @@ class Plugger(object):
 
         # Gets the active pluggings
         activePluggings = getActivePluggings()
+        activePluggingsByCart = getActivePluggingsByCart(activePluggings,
+                                                         self.carts)
 
-        # Gets the status of the plates in each cart.
-        cartStatus = [getCartStatus(activePluggings, cartNumber)
-                      for cartNumber in self.carts
-                      if cartNumber not in offlineCarts]
+        # Gets the status of the plates in each cart. Getting the status
+        # requires calculating the completion of the plugged plates, so we
+        # do it once for all the carts and reuse it when logging.
+        cartStatus = {cartNumber: getCartStatus(activePluggingsByCart,
+                                                cartNumber)
+                      for cartNumber in self.carts}
 
         # Sorts carts by priority.
-        sortedCarts = prioritiseCarts(cartStatus)
+        sortedCarts = deque(prioritiseCarts(
+            [cartStatus[cartNumber] for cartNumber in self.carts
+             if cartNumber not in offlineCarts]))
 
-        # Gets a list of plugged plates and the carts in which they are plugged
-        plugged = [plate for plate in plates if plate.isPlugged]
-        pluggedCarts = [plate.getActiveCartNumber() for plate in plugged]
+        # Splits the plates in a single pass. Gets a list of force-plug plates
+        # and a list of plugged plates and the carts in which they are plugged.
+        forcePlugPlates = []
+        plugged = []
 
-        allocatedPlates = []
+        for plate in plates:
+            if plate.priority == forcePlugPriority:
+                forcePlugPlates.append(plate)
+            activePlugging = plate.getActivePlugging()
+            if activePlugging is not None:
+                plugged.append((plate, int(activePlugging.cartridge.number)))
+
+        pluggedCarts = set([cartNumber for plate, cartNumber in plugged])
+
+        # Keeps track of the plate_ids of the plates already allocated.
+        allocatedPlateIDs = set()
+
+        # Gets the cart of the last plugging of each plate
+        lastCarts = getCartsLastPlugging(plates)
 
         # Allocates force-plug plates. If the plate has been plugged before
         # tries to use the same cart, unless that cart is offline or contains
         # a plate that we want to keep plugged.
-        forcePlugPlates = [plate for plate in plates
-                           if plate.priority == forcePlugPriority]
-
         for plate in forcePlugPlates:
-            lastCart = getCartLastPlugging(plate)
+            lastCart = lastCarts.get(plate.plate_id)
             if (lastCart is not None and lastCart not in offlineCarts and
                     lastCart not in pluggedCarts):
                 self.carts[lastCart] = plate
             else:
                 cartData = self._getCart(sortedCarts)
-                self.carts[cartData[0]] = plate
-            allocatedPlates.append(plate)
+                self.carts[cartData.cartNumber] = plate
+            allocatedPlateIDs.add(plate.plate_id)
 
         # Allocates plates that are already plugged.
-        for plate in plugged:
-            if plate in allocatedPlates:
+        for plate, cartNumber in plugged:
+            if plate.plate_id in allocatedPlateIDs:
                 continue
-            cartNumber = plate.getActiveCartNumber()
             if self.carts[cartNumber] is None:
                 self.carts[cartNumber] = plate
             else:
                 cartData = self._getCart(sortedCarts)
-                self.carts[cartData[0]] = plate
-            allocatedPlates.append(plate)
+                self.carts[cartData.cartNumber] = plate
+            allocatedPlateIDs.add(plate.plate_id)
 
         # Allocates replugs.
         for plate in plates:
-            if plate in allocatedPlates:
+            if plate.plate_id in allocatedPlateIDs:
                 continue
 
-            lastCart = getCartLastPlugging(plate)
+            lastCart = lastCarts.get(plate.plate_id)
             if lastCart is None or lastCart in offlineCarts:
                 continue
 
             if self.carts[lastCart] is None:
                 self.carts[lastCart] = plate
-                allocatedPlates.append(plate)
+                allocatedPlateIDs.add(plate.plate_id)
             else:
                 log.debug('PLUGGER: not plugging plate {0} in its '
                           'original cart {1} because it is not available'
@@ -542,34 +667,41 @@ class Plugger(object):
 
         # Allocates the remaining plates
         for plate in plates:
-            if plate in allocatedPlates:
+            if plate.plate_id in allocatedPlateIDs:
                 continue
 
             cartData = self._getCart(sortedCarts)
-            cartNumber, pluggedPlate, statusCode, completion = cartData
-            self.carts[cartNumber] = plate
-            allocatedPlates.append(plate)
+            self.carts[cartData.cartNumber] = plate
+            allocatedPlateIDs.add(plate.plate_id)
 
-        if len(plates) > len(allocatedPlates):
+        if len(plates) > len(allocatedPlateIDs):
             warnings.warn('PLUGGER: {0} plates have not been allocated'
-                          .format(len(plates) - len(allocatedPlates)),
+                          .format(len(plates) - len(allocatedPlateIDs)),
                           TotoroPluggerWarning)
 
         remainingCarts = [cart for cart in sortedCarts
-                          if self.carts[cart[0]] is None]
+                          if self.carts[cart.cartNumber] is None]
 
         # Checks unassigned carts
         for cart in remainingCarts:
-            cartNumber, pluggedPlate, statusCode, completion = cart
-            if completion >= 1:
+            if cart.completion >= 1:
                 continue
-            elif (cartStatusCodes[statusCode] != 'noMaNGAplate' and
-                    pluggedPlate is not None):
+            elif (cartStatusCodes[cart.statusCode] != 'noMaNGAplate' and
+                    cart.plate is not None):
                 # If this is a MaNGA plate, keeps it.
-                self.carts[cartNumber] = pluggedPlate
+                self.carts[cart.cartNumber] = cart.plate
+
+        # Force-plug plates can be allocated to the cart of their last
+        # plugging even if it is not a MaNGA cart (e.g., an APOGEE cart). We
+        # get the status of those carts so that they can be logged.
+        for cartNumber in self.carts:
+            if cartNumber not in cartStatus:
+                cartStatus[cartNumber] = getCartStatus(
+                    getActivePluggingsByCart(activePluggings, [cartNumber]),
+                    cartNumber)
 
         # Logs the allocation
-        self.logCartAllocation(activePluggings)
+        self.logCartAllocation(cartStatus, lastCarts)
 
     def getASOutput(self, **kwargs):
         """Returns the plugging request in the autoscheduler format."""
@@ -585,24 +717,22 @@ class Plugger(object):
         # In this way, they'll first use our carts with lower priority.
         cartOrder = self.getCartOrder(mode=mode)
 
-        # Removes cart without an allocated MaNGA plate
-        carts = OrderedDict([(key, value) for key, value in self.carts.items()
-                             if value is not None])
+        # Removes carts without an allocated MaNGA plate and changes the
+        # Totoro.Plate instances to plate_ids
+        carts = OrderedDict([(key, plate.plate_id)
+                             for key, plate in self.carts.items()
+                             if plate is not None])
 
         # First we add carts not used to cart_order, with lower priority
+        usedCarts = set(cartOrder)
         nonUsedCarts = [cartNo for cartNo in config['mangaCarts']
-                        if cartNo not in cartOrder]
+                        if cartNo not in usedCarts]
 
         cartOrder = nonUsedCarts + cartOrder
 
         # We also add the APOGEE carts
         cartOrder = config['apogeeCarts'][::-1] + cartOrder
 
-        # We change the Totoro.Plate instances to plate_ids
-        for key in carts:
-            if key != 'cart_order' and carts[key] is not None:
-                carts[key] = carts[key].plate_id
-
         carts['cart_order'] = cartOrder
 
         return carts
@@ -643,53 +773,60 @@ class Plugger(object):
         scheduled = []
         forcePlug = []
 
-        for cart, plate in self.carts.iteritems():
+        # Keeps the completion of each plate so that we can reuse it later.
+        completions = {}
+
+        for cart, plate in self.carts.items():
             if plate is None:
                 continue
             if plate.priority == forcePlugPriority:
                 forcePlug.append((cart, plate))
-            elif plate.getPlateCompletion(useMock=False) > 1:
+                continue
+
+            completions[cart] = plate.getPlateCompletion(useMock=False)
+            if completions[cart] > 1:
                 completed.append((cart, plate))
             else:
                 scheduled.append((cart, plate))
 
         if mode == 'mangaLead':
 
-            # Retrieves how many scheduled (mock) exposures are in each plate.
-            nExposures = [self._nNewExposures[plate.plate_id]
-                          if plate.plate_id in self._nNewExposures else 0
-                          for cart, plate in scheduled]
-
-            # Sorts scheduled exposures from few to many scheduled exposures.
-            scheduledOrdered = [scheduled[ii] for ii in np.argsort(nExposures)]
+            # Sorts scheduled plates from few to many scheduled (mock)
+            # exposures.
+            scheduledOrdered = sorted(
+                scheduled,
+                key=lambda xx: self._nNewExposures.get(xx[1].plate_id, 0))
 
         elif mode == 'apogeeLead':
 
-            # Finds out what plates have incomplete sets.
+            # Finds out what plates have incomplete sets and gets the
+            # completion used to sort them. For plates with incomplete sets we
+            # take them into account. For plates with complete sets and no mock
+            # sets the completion including mock exposures is the same we have
+            # already calculated.
             incompleteSets = []
             completeSets = []
 
-            for ii in range(len(scheduled)):
-                if scheduled[ii][1].hasIncompleteSets():
-                    incompleteSets.append(scheduled[ii])
+            for cart, plate in scheduled:
+                if plate.hasIncompleteSets():
+                    incompleteSets.append(
+                        (cart, plate,
+                         plate.getPlateCompletion(includeIncompleteSets=True)))
+                elif any([ss.isMock for ss in plate.sets]):
+                    completeSets.append(
+                        (cart, plate, plate.getPlateCompletion()))
                 else:
-                    completeSets.append(scheduled[ii])
-
-            # Sorts the scheduled plates according to completion. For plates
-            # with incomplete sets we take them into account.
-
-            sortedIncompleteSets = sorted(
-                incompleteSets, key=lambda xx: xx[1].getPlateCompletion(
-                    includeIncompleteSets=True))
-
-            sortedCompleteSets = sorted(
-                completeSets, key=lambda xx: xx[1].getPlateCompletion())
+                    completeSets.append((cart, plate, completions[cart]))
 
-            # We put plates with complete sets first
-            scheduledOrdered = sortedCompleteSets + sortedIncompleteSets
+            # Sorts the scheduled plates according to completion. We put
+            # plates with complete sets first.
+            scheduledOrdered = [
+                (cart, plate) for cart, plate, completion in
+                sorted(completeSets, key=itemgetter(2)) +
+                sorted(incompleteSets, key=itemgetter(2))]
 
-        usedCarts = [cart for cart, plate in
-                     completed + scheduledOrdered + forcePlug]
+        usedCarts = set([cart for cart, plate in
+                         completed + scheduledOrdered + forcePlug])
 
         # Creates master ordered list
         if mode == 'mangaLead':
@@ -697,13 +834,9 @@ class Plugger(object):
                        if cart not in usedCarts]
             orderedCarts = completed + offline + scheduledOrdered + forcePlug
         else:
-            # Identifies the first plate with incomplete sets
-            ii = 0
-            for cart, plate in scheduledOrdered:
-                if np.any([ss.getStatus()[0] == 'Incomplete'
-                           for ss in plate.sets]):
-                    break
-                ii += 1
+            # Identifies the first plate with incomplete sets. Plates with
+            # complete sets go first, so we don't need to check the sets again.
+            ii = len(completeSets)
 
             # Adds offline carts before
             for cart in config['offlineCarts']:
@@ -56,6 +56,9 @@ class Timeline(object):
         self.endDate = endDate
         self.scheduled = []
 
+        # Number of new (mock) exposures scheduled for each plate.
+        self.nNewExposures = {}
+
         self.unallocatedRange = np.array([self.startDate, self.endDate])
 
     def allocateJDs(self, exposures, **kwargs):
@@ -156,6 +159,9 @@ class Timeline(object):
                     self.scheduled.remove(optimalPlate)
 
                 self.scheduled.append(optimalPlate)
+                self.nNewExposures[optimalPlate] = (
+                    self.nNewExposures.get(optimalPlate, 0) +
+                    len(newExposures))
 
                 # Updates self.unallocatedRange with the new exposures.
                 self.allocateJDs(newExposures)
@@ -15,15 +15,29 @@ Revision history:
 from __future__ import division
 from __future__ import print_function
 from Totoro.scheduler import Plugger
-from Totoro import config
+from Totoro.scheduler.plugger import getCartsLastPlugging
+from Totoro.scheduler.plugger import getPlatesStatusAndLocation
+from Totoro import config, log
 from Totoro.db import getConnection
 from collections import OrderedDict
+import logging
 import unittest
 
 db = getConnection('test')
 session = db.Session()
 
 
+class ListHandler(logging.Handler):
+    """A logging handler that keeps the messages in a list."""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
 class TestPlugger(unittest.TestCase):
 
     @classmethod
@@ -115,6 +129,85 @@ class TestPlugger(unittest.TestCase):
 
         self.assertEqual(validResult, plugger.getASOutput())
 
+    def testCartsLastPlugging(self):
+        """Tests the cart of the last plugging of a list of plates."""
+
+        plateIDs = [8081, 8482, 8486, 8550]
+
+        with session.begin():
+
+            plates = session.query(db.plateDB.Plate).filter(
+                db.plateDB.Plate.plate_id.in_(plateIDs)).all()
+
+        lastCarts = getCartsLastPlugging(plates)
+
+        with session.begin():
+
+            # Checks that at least one of the plates has several pluggings.
+            self.assertTrue(any([len(plate.pluggings) > 1
+                                 for plate in plates]))
+
+            # Compares with the cart of the last plugging in plate.pluggings.
+            # Pluggings without fscan_mjd go first; ties are broken by pk.
+            for plate in plates:
+                if len(plate.pluggings) == 0:
+                    self.assertNotIn(plate.plate_id, lastCarts)
+                    continue
+                lastPlugging = max(
+                    plate.pluggings,
+                    key=lambda plugging: (plugging.fscan_mjd is not None,
+                                          plugging.fscan_mjd, plugging.pk))
+                self.assertEqual(lastCarts[plate.plate_id],
+                                 lastPlugging.cartridge.number)
+
+    def testPlatesStatusAndLocation(self):
+        """Tests the status and location labels of a list of plates."""
+
+        plateIDs = [8081, 8482, 8486, 8550]
+
+        with session.begin():
+
+            plates = session.query(db.plateDB.Plate).filter(
+                db.plateDB.Plate.plate_id.in_(plateIDs)).all()
+
+        labels = getPlatesStatusAndLocation(plates)
+
+        self.assertItemsEqual(labels.keys(), plateIDs)
+        self.assertEqual(getPlatesStatusAndLocation([]), {})
+
+        with session.begin():
+            for plate in plates:
+                self.assertEqual(labels[plate.plate_id],
+                                 (plate.statuses[0].label,
+                                  plate.location.label))
+
+    def testReplugMessage(self):
+        """Tests that a replugged plate is logged as a replug."""
+
+        # Moves plate 8081 to APO
+        with session.begin():
+            plate8081 = session.query(db.plateDB.Plate).filter(
+                db.plateDB.Plate.plate_id == 8081).one()
+            plate8081.plate_location_pk = 23
+
+        handler = ListHandler()
+        log.addHandler(handler)
+
+        try:
+            plugger = Plugger(startDate=2457307.806736,
+                              endDate=2457307.998611, useInitialBuffer=False)
+            plugger.getASOutput()
+        finally:
+            log.removeHandler(handler)
+
+        # Selects the cart allocation message for plate 8081
+        messages = [message for message in handler.messages
+                    if message.startswith('Cart #') and
+                    'plate_id=8081' in message]
+
+        self.assertEqual(len(messages), 1)
+        self.assertIn(', replug', messages[0])
+
     def testForcePlug(self):
         """Tests Plugger with a plate with priotity=10."""
 
@@ -141,6 +234,33 @@ class TestPlugger(unittest.TestCase):
 
         self.assertEqual(validResult, plugger.getASOutput())
 
+    def testForcePlugNonMaNGACart(self):
+        """Tests a force-plug plate whose last cart is not a MaNGA cart."""
+
+        with session.begin():
+
+            plate8550 = session.query(db.plateDB.Plate).filter(
+                db.plateDB.Plate.plate_id == 8550).one()
+            plate8550.plate_pointings[0].priority = 10
+
+        lastCart = getCartsLastPlugging([plate8550]).get(8550)
+        self.assertIsNotNone(lastCart)
+
+        # Removes the last cart of plate 8550 from the list of MaNGA carts.
+        originalMaNGACarts = config['mangaCarts']
+        config['mangaCarts'] = [cart for cart in range(1, 7)
+                                if cart != lastCart]
+        config['offlineCarts'] = []
+
+        try:
+            plugger = Plugger(startDate=2457185.64931, endDate=2457185.82347,
+                              useInitialBuffer=False)
+            output = plugger.getASOutput()
+        finally:
+            config['mangaCarts'] = originalMaNGACarts
+
+        self.assertEqual(output[lastCart], 8550)
+
     def testCartOrder(self):
         """Tests the cart order returned by the Plugger."""
 